@@ -5,54 +5,162 @@ This API intentionally includes common failure scenarios that occur
 in production integrations. Used to demonstrate troubleshooting skills.
 
 Run with: uvicorn main:app --reload
+Multi-core: uvicorn main:app --workers $((2 * $(nproc) + 1))
 Test with: curl http://localhost:8000/health
 """
 
-from fastapi import FastAPI, HTTPException, Header, Query
-from typing import Optional
+from fastapi import FastAPI, HTTPException, Header, Query, Depends
+from fastapi.responses import ORJSONResponse
+from typing import Optional, Dict, Deque, List
+from collections import OrderedDict, deque, defaultdict
+from dataclasses import dataclass
+from itertools import count
+import asyncio
+import hmac
 import time
 from datetime import datetime
 
-app = FastAPI(title="Alert Integration Demo API")
+# orjson serializes responses in C instead of the stdlib json encoder
+app = FastAPI(
+    title="Alert Integration Demo API",
+    default_response_class=ORJSONResponse
+)
+
+# Simulated credential store
+VALID_API_KEY = "valid-key-123"
 
 # Simulated rate limiting
-request_counts = {}
+# Each client IP maps to a deque of request timestamps (oldest first),
+# never holding more than RATE_LIMIT entries. Clients are ordered by their
+# most recent request, so ones idle for a full window are evicted from the
+# front - the log only holds clients seen within the last RATE_WINDOW.
+request_log: "OrderedDict[str, Deque[float]]" = OrderedDict()
 RATE_LIMIT = 5
 RATE_WINDOW = 60  # seconds
 
+# Alert validation rules
+REQUIRED_FIELDS = frozenset(("tenant", "alert_type", "severity"))
+SEVERITY_LEVELS = ("low", "medium", "high", "critical")  # display order
+VALID_SEVERITIES = frozenset(SEVERITY_LEVELS)
+
 # Simulated database
-alerts_db = [
-    {"id": 1, "tenant": "client-a", "alert_type": "MFA_FAILURE", "severity": "high", "timestamp": "2024-01-15T10:30:00Z"},
-    {"id": 2, "tenant": "client-b", "alert_type": "MFA_FAILURE", "severity": "high", "timestamp": "2024-01-15T10:31:00Z"},
-    {"id": 3, "tenant": "client-a", "alert_type": "MALWARE_DETECTED", "severity": "critical", "timestamp": "2024-01-15T10:32:00Z"},
+@dataclass(slots=True)
+class Alert:
+    """Stored alert record - slotted, so no per-instance __dict__"""
+    id: int
+    tenant: str
+    alert_type: str
+    severity: str
+    timestamp: str
+
+
+alerts_db: List[Alert] = [
+    Alert(id=1, tenant="client-a", alert_type="MFA_FAILURE", severity="high", timestamp="2024-01-15T10:30:00Z"),
+    Alert(id=2, tenant="client-b", alert_type="MFA_FAILURE", severity="high", timestamp="2024-01-15T10:31:00Z"),
+    Alert(id=3, tenant="client-a", alert_type="MALWARE_DETECTED", severity="critical", timestamp="2024-01-15T10:32:00Z"),
 ]
 
+
+def index_by_tenant(alerts: List[Alert]) -> Dict[str, List[Alert]]:
+    """Group alerts by tenant, preserving their original order"""
+    by_tenant: Dict[str, List[Alert]] = defaultdict(list)
+    for alert in alerts:
+        by_tenant[alert.tenant].append(alert)
+    return by_tenant
+
+
+# Index alerts by tenant so filtered reads skip scanning every alert
+# (create_alert keeps this in sync with alerts_db)
+alerts_by_tenant = index_by_tenant(alerts_db)
+
+# Alert ID sequence - IDs are minted independently of the list length,
+# so they stay unique even if old alerts are ever pruned
+alert_ids = count(start=len(alerts_db) + 1)
+
 users_db = [
     {"id": 1, "username": "analyst1", "role": "soc_analyst", "tenant": "client-a"},
     {"id": 2, "username": "analyst2", "role": "soc_lead", "tenant": "client-b"},
 ]
 
+# Index users by ID so lookups are a single dict probe
+# (keep in sync with users_db if users are ever added)
+users_by_id = {user["id"]: user for user in users_db}
+
+
+async def require_api_key(
+    api_key: Optional[str] = Header(None, alias="X-API-Key")
+) -> str:
+    """
+    Shared authentication check for protected endpoints.
+    
+    Demonstrates:
+    - 401 Unauthorized (missing API key)
+    - 403 Forbidden (invalid API key)
+    
+    Uses a constant-time comparison so response timing doesn't leak
+    how much of the key matched.
+    """
+    # Simulate 401 - Missing authentication
+    if api_key is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Missing authentication. Include X-API-Key header."
+        )
+    
+    # Simulate 403 - Invalid credentials (valid format but wrong key)
+    if not hmac.compare_digest(api_key.encode(), VALID_API_KEY.encode()):
+        raise HTTPException(
+            status_code=403,
+            detail="Invalid API key. Access forbidden."
+        )
+    
+    return api_key
+
 
-def check_rate_limit(client_ip: str):
-    """Simulate rate limiting (429 errors)"""
+async def rate_limit(
+    client_ip: str = Header(default="127.0.0.1", alias="X-Forwarded-For"),
+    api_key: str = Depends(require_api_key)
+):
+    """
+    Simulate rate limiting (429 errors) as a sliding window per client IP.
+    
+    Depends on require_api_key, so authentication always runs first and
+    rejected (401/403) requests never use up a client's budget. FastAPI
+    caches the dependency, so endpoints that also declare it only
+    authenticate once per request.
+    
+    Timestamps are kept oldest-first, so expired entries are popped off
+    the left end instead of rebuilding the whole list on every request.
+    
+    Returns the client IP the request was counted against.
+    """
     now = time.time()
     
-    if client_ip not in request_counts:
-        request_counts[client_ip] = []
+    # Evict clients whose newest request has left the window (X-Forwarded-For
+    # is client-controlled, so the log must not keep every value ever sent)
+    while request_log:
+        newest = next(iter(request_log.values()))[-1]
+        if now - newest < RATE_WINDOW:
+            break
+        request_log.popitem(last=False)
+    
+    # X-Forwarded-For may list a proxy chain - the first entry is the client
+    client_key = client_ip.split(",")[0].strip()
+    timestamps = request_log.setdefault(client_key, deque(maxlen=RATE_LIMIT))
     
     # Remove old requests outside the window
-    request_counts[client_ip] = [
-        req_time for req_time in request_counts[client_ip] 
-        if now - req_time < RATE_WINDOW
-    ]
+    while timestamps and now - timestamps[0] >= RATE_WINDOW:
+        timestamps.popleft()
     
-    if len(request_counts[client_ip]) >= RATE_LIMIT:
+    if len(timestamps) >= RATE_LIMIT:
         raise HTTPException(
             status_code=429,
             detail=f"Rate limit exceeded. Max {RATE_LIMIT} requests per {RATE_WINDOW} seconds."
         )
     
-    request_counts[client_ip].append(now)
+    timestamps.append(now)
+    request_log.move_to_end(client_key)
+    return client_key
 
 
 @app.get("/health")
@@ -72,7 +180,7 @@ async def health_check():
 async def get_alerts(
     tenant: Optional[str] = None,
     limit: int = Query(default=10, le=100),
-    api_key: Optional[str] = Header(None, alias="X-API-Key")
+    api_key: str = Depends(require_api_key)
 ):
     """
     Get alerts with authentication and pagination
@@ -97,24 +205,10 @@ async def get_alerts(
       (filtered results)
     """
     
-    # Simulate 401 - Missing authentication
-    if api_key is None:
-        raise HTTPException(
-            status_code=401,
-            detail="Missing authentication. Include X-API-Key header."
-        )
-    
-    # Simulate 403 - Invalid credentials (valid format but wrong key)
-    if api_key != "valid-key-123":
-        raise HTTPException(
-            status_code=403,
-            detail="Invalid API key. Access forbidden."
-        )
-    
     # Filter by tenant if provided
     results = alerts_db
     if tenant:
-        results = [alert for alert in alerts_db if alert["tenant"] == tenant]
+        results = alerts_by_tenant.get(tenant, [])
     
     # Apply limit (pagination simulation)
     results = results[:limit]
@@ -130,8 +224,8 @@ async def get_alerts(
 @app.post("/alerts")
 async def create_alert(
     alert_data: dict,
-    api_key: Optional[str] = Header(None, alias="X-API-Key"),
-    client_ip: str = Header(default="127.0.0.1", alias="X-Forwarded-For")
+    api_key: str = Depends(require_api_key),
+    client_ip: str = Depends(rate_limit)
 ):
     """
     Create a new alert
@@ -153,44 +247,42 @@ async def create_alert(
       (succeeds with 201)
     """
     
-    # Check authentication
-    if api_key is None:
-        raise HTTPException(status_code=401, detail="Missing authentication")
-    
-    if api_key != "valid-key-123":
-        raise HTTPException(status_code=403, detail="Invalid API key")
-    
-    # Check rate limiting
-    check_rate_limit(client_ip)
-    
     # Validate required fields (400 Bad Request)
-    required_fields = ["tenant", "alert_type", "severity"]
-    missing_fields = [field for field in required_fields if field not in alert_data]
+    missing_fields = REQUIRED_FIELDS - alert_data.keys()
     
     if missing_fields:
         raise HTTPException(
             status_code=400,
-            detail=f"Missing required fields: {', '.join(missing_fields)}"
+            detail=f"Missing required fields: {', '.join(sorted(missing_fields))}"
+        )
+    
+    # Validate field values (non-strings can't be hashed into the set lookup)
+    severity = alert_data["severity"]
+    if not isinstance(severity, str) or severity not in VALID_SEVERITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid severity. Must be one of: {', '.join(SEVERITY_LEVELS)}"
         )
     
-    # Validate field values
-    valid_severities = ["low", "medium", "high", "critical"]
-    if alert_data["severity"] not in valid_severities:
+    # Tenant keys the alerts_by_tenant index, so it must be a string
+    tenant = alert_data["tenant"]
+    if not isinstance(tenant, str):
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid severity. Must be one of: {', '.join(valid_severities)}"
+            detail="Invalid tenant. Must be a string."
         )
     
     # Create the alert
-    new_alert = {
-        "id": len(alerts_db) + 1,
-        "tenant": alert_data["tenant"],
-        "alert_type": alert_data["alert_type"],
-        "severity": alert_data["severity"],
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
+    new_alert = Alert(
+        id=next(alert_ids),
+        tenant=tenant,
+        alert_type=alert_data["alert_type"],
+        severity=severity,
+        timestamp=datetime.utcnow().isoformat() + "Z"
+    )
     
     alerts_db.append(new_alert)
+    alerts_by_tenant[new_alert.tenant].append(new_alert)
     
     return {
         "message": "Alert created successfully",
@@ -201,7 +293,7 @@ async def create_alert(
 @app.get("/users/{user_id}")
 async def get_user(
     user_id: int,
-    api_key: Optional[str] = Header(None, alias="X-API-Key")
+    api_key: str = Depends(require_api_key)
 ):
     """
     Get user by ID
@@ -218,10 +310,7 @@ async def get_user(
       (fails with 404)
     """
     
-    if api_key != "valid-key-123":
-        raise HTTPException(status_code=401, detail="Missing or invalid API key")
-    
-    user = next((u for u in users_db if u["id"] == user_id), None)
+    user = users_by_id.get(user_id)
     
     if user is None:
         raise HTTPException(
@@ -242,7 +331,9 @@ async def simulate_timeout():
     - curl http://localhost:8000/simulate-timeout
       (takes 10 seconds, may timeout depending on client settings)
     """
-    time.sleep(10)  # Simulate slow backend
+    # Simulate slow backend - awaited so the worker keeps serving other
+    # requests (time.sleep here would block the whole event loop)
+    await asyncio.sleep(10)
     return {"message": "This took way too long"}
 
 
@@ -262,5 +353,19 @@ async def simulate_server_error():
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    
+    # WEB_CONCURRENCY > 1 runs that many worker processes
+    # (multi-process mode needs the app as an import string)
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    
+    # uvicorn's "auto" loop/http settings pick uvloop (libuv event loop) and
+    # httptools (C HTTP parser) when installed, falling back to asyncio and
+    # h11 elsewhere (uvloop doesn't support Windows)
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        workers=workers
+    )
\ No newline at end of file
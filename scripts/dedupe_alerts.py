@@ -17,131 +17,17 @@ Date: January 2026
 
 import json
 import hashlib
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from collections import defaultdict
+from typing import Dict, Any, List
 
-
-def normalize_string(value: Any) -> str:
-    """
-    Normalize a value for consistent key generation.
-    
-    Handles:
-    - Case normalization (uppercase -> lowercase)
-    - Whitespace trimming
-    - None/null values
-    - Non-string types (convert to string)
-    
-    Args:
-        value: Any value to normalize
-    
-    Returns:
-        Normalized lowercase string
-    """
-    if value is None:
-        return ""
-    
-    # Convert to string and normalize
-    return str(value).lower().strip()
-
-
-def bucket_timestamp(timestamp_str: str, bucket_minutes: int = 60) -> str:
-    """
-    Round timestamp down to nearest time bucket.
-    
-    This groups alerts that occur within the same time window.
-    
-    Examples (with 60-minute bucket):
-        14:23:45 -> 14:00
-        14:58:12 -> 14:00
-        15:05:33 -> 15:00
-    
-    Examples (with 15-minute bucket):
-        14:23:45 -> 14:15
-        14:58:12 -> 14:45
-        15:05:33 -> 15:00
-    
-    Args:
-        timestamp_str: ISO format timestamp string
-        bucket_minutes: Size of time bucket in minutes (default: 60)
-    
-    Returns:
-        Bucketed timestamp string (YYYY-MM-DDTHH:MM)
-    """
-    try:
-        # Parse timestamp (handle various formats)
-        # Remove 'Z' suffix and any timezone info for parsing
-        clean_ts = timestamp_str.replace('Z', '').split('+')[0].split('.')[0]
-        dt = datetime.fromisoformat(clean_ts)
-        
-        # Calculate bucket
-        # Floor divide minutes to nearest bucket
-        bucketed_minute = (dt.minute // bucket_minutes) * bucket_minutes
-        
-        # Create bucketed datetime
-        bucketed_dt = dt.replace(minute=bucketed_minute, second=0, microsecond=0)
-        
-        # Return as string (without seconds for cleaner keys)
-        return bucketed_dt.strftime('%Y-%m-%dT%H:%M')
-    
-    except (ValueError, AttributeError) as e:
-        # If parsing fails, return original (better than crashing)
-        print(f"Warning: Could not parse timestamp '{timestamp_str}': {e}")
-        return timestamp_str
-
-
-def generate_dedupe_key(
-    alert: Dict[str, Any],
-    key_fields: List[str],
-    time_field: str = "timestamp",
-    bucket_minutes: int = 60,
-    include_hash: bool = True
-) -> str:
-    """
-    Generate a deduplication key from alert fields.
-    
-    The key is deterministic - same input always produces same output.
-    Alerts with matching keys are candidates for grouping.
-    
-    Args:
-        alert: Alert dictionary
-        key_fields: List of field names to include in key (order matters)
-        time_field: Name of timestamp field (will be bucketed)
-        bucket_minutes: Time bucket size in minutes
-        include_hash: If True, append MD5 hash for shorter keys
-    
-    Returns:
-        Dedupe key string
-    
-    Example:
-        alert = {"alert_type": "MFA_FAILURE", "source": "Defender", "timestamp": "..."}
-        key_fields = ["alert_type", "source"]
-        
-        Result: "mfa_failure|defender|2026-01-22T14:00"
-        Or with hash: "mfa_failure|defender|2026-01-22T14:00|a1b2c3d4"
-    """
-    key_parts = []
-    
-    # Extract and normalize each key field
-    for field in key_fields:
-        value = alert.get(field, "")
-        normalized = normalize_string(value)
-        key_parts.append(normalized)
-    
-    # Add bucketed timestamp if time_field exists
-    if time_field and time_field in alert:
-        bucketed_time = bucket_timestamp(alert[time_field], bucket_minutes)
-        key_parts.append(bucketed_time)
-    
-    # Join parts with pipe delimiter
-    key_string = "|".join(key_parts)
-    
-    # Optionally append hash for shorter, fixed-length keys
-    if include_hash:
-        # MD5 is fine here (not for security, just for key shortening)
-        hash_suffix = hashlib.md5(key_string.encode()).hexdigest()[:8]
-        key_string = f"{key_string}|{hash_suffix}"
-    
-    return key_string
+# Key-building hot path lives in dedupe_core so it can be compiled with
+# mypyc; re-exported here so existing imports keep working
+from dedupe_core import (
+    normalize_string,
+    bucket_timestamp,
+    generate_dedupe_key,
+    readable_keys,
+)
 
 
 def generate_dedupe_key_hash_only(
@@ -163,14 +49,18 @@ def generate_dedupe_key_hash_only(
         bucket_minutes: Time bucket size
     
     Returns:
-        32-character MD5 hash string
+        32-character BLAKE2b-128 hash string
     """
     # Build the source string
+    # Each value is length-prefixed, so a "&" or "=" inside a value can't
+    # shift it into the next field. With plain field=value tags,
+    # alert_type="x&source=", source="" and alert_type="x", source="&source="
+    # both become "alert_type=x&source=&source=" and collide
     parts = []
     
     for field in key_fields:
         value = normalize_string(alert.get(field, ""))
-        parts.append(f"{field}={value}")
+        parts.append(f"{field}={len(value)}:{value}")
     
     if time_field and time_field in alert:
         bucketed = bucket_timestamp(alert[time_field], bucket_minutes)
@@ -178,8 +68,8 @@ def generate_dedupe_key_hash_only(
     
     source_string = "&".join(parts)
     
-    # Return full MD5 hash
-    return hashlib.md5(source_string.encode()).hexdigest()
+    # Return full 128-bit BLAKE2b hash (same length as MD5)
+    return hashlib.blake2b(source_string.encode(), digest_size=16).hexdigest()
 
 
 def group_alerts_by_dedupe_key(
@@ -203,24 +93,13 @@ def group_alerts_by_dedupe_key(
     Returns:
         Dictionary mapping dedupe keys to lists of matching alerts
     """
-    groups = {}
+    keys = readable_keys(alerts, key_fields, time_field, bucket_minutes)
     
-    for alert in alerts:
-        # Generate key for this alert
-        key = generate_dedupe_key(
-            alert=alert,
-            key_fields=key_fields,
-            time_field=time_field,
-            bucket_minutes=bucket_minutes,
-            include_hash=False  # Readable keys for grouping
-        )
-        
-        # Add to appropriate group
-        if key not in groups:
-            groups[key] = []
+    groups = defaultdict(list)
+    for key, alert in zip(keys, alerts):
         groups[key].append(alert)
     
-    return groups
+    return dict(groups)
 
 
 def analyze_groups(groups: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
@@ -233,15 +112,25 @@ def analyze_groups(groups: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
     Returns:
         Analysis summary
     """
-    total_alerts = sum(len(alerts) for alerts in groups.values())
-    multi_tenant_groups = {k: v for k, v in groups.items() if len(v) > 1}
+    total_alerts = 0
+    multi_tenant_events = 0
+    largest_group_size = 0
+    
+    # Single pass over the groups - counts only, no filtered copies
+    for group in groups.values():
+        size = len(group)
+        total_alerts += size
+        if size > 1:
+            multi_tenant_events += 1
+        if size > largest_group_size:
+            largest_group_size = size
     
     return {
         "total_alerts": total_alerts,
         "unique_events": len(groups),
-        "multi_tenant_events": len(multi_tenant_groups),
+        "multi_tenant_events": multi_tenant_events,
         "alerts_deduplicated": total_alerts - len(groups),
-        "largest_group_size": max(len(v) for v in groups.values()) if groups else 0
+        "largest_group_size": largest_group_size
     }
 
 
@@ -0,0 +1,204 @@
+"""
+Alert Deduplication Core
+
+Purpose:
+    Typed hot path for alert deduplication: value normalization, timestamp
+    bucketing and readable dedupe key generation. Kept in its own module so
+    it can be ahead-of-time compiled with mypyc; dedupe_alerts.py imports
+    from here.
+
+Build (optional):
+    pip install mypy
+    mypyc dedupe_core.py
+    
+    This produces a compiled extension next to this file, which Python
+    imports instead of the .py. Without it, this file is used as plain
+    Python - behavior is identical either way.
+
+Author: Clinton Howard
+Date: January 2026
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, List, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_string(value: Any) -> str:
+    """
+    Normalize a value for consistent key generation.
+    
+    Handles:
+    - Case normalization (uppercase -> lowercase)
+    - Whitespace trimming
+    - None/null values
+    - Non-string types (convert to string)
+    
+    Args:
+        value: Any value to normalize
+    
+    Returns:
+        Normalized lowercase string
+    """
+    if value is None:
+        return ""
+    
+    # Fast path: JSON-sourced alert fields are almost always plain strings
+    if type(value) is str:
+        return value.lower().strip()
+    
+    # Convert to string and normalize
+    return str(value).lower().strip()
+
+
+@lru_cache(maxsize=8192)
+def bucket_timestamp(timestamp_str: str, bucket_minutes: int = 60) -> str:
+    """
+    Round timestamp down to nearest time bucket.
+    
+    This groups alerts that occur within the same time window.
+    
+    Results are cached - alert bursts (e.g. during an outage) repeat the
+    same timestamps many times. An unparseable timestamp is only warned
+    about the first time it is seen.
+    
+    Examples (with 60-minute bucket):
+        14:23:45 -> 14:00
+        14:58:12 -> 14:00
+        15:05:33 -> 15:00
+    
+    Examples (with 15-minute bucket):
+        14:23:45 -> 14:15
+        14:58:12 -> 14:45
+        15:05:33 -> 15:00
+    
+    Args:
+        timestamp_str: ISO format timestamp string
+        bucket_minutes: Size of time bucket in minutes (default: 60)
+    
+    Returns:
+        Bucketed timestamp string (YYYY-MM-DDTHH:MM)
+    """
+    try:
+        # Fast path for the canonical shape (YYYY-MM-DDTHH:MM...): the bucket
+        # only depends on the minute, so slice it out instead of parsing
+        if (
+            len(timestamp_str) >= 16
+            and timestamp_str[4] == '-'
+            and timestamp_str[10] == 'T'
+            and timestamp_str[13] == ':'
+            and timestamp_str[14:16].isdigit()
+        ):
+            minute = int(timestamp_str[14:16])
+            if minute < 60:
+                bucketed_minute = (minute // bucket_minutes) * bucket_minutes
+                return f"{timestamp_str[:14]}{bucketed_minute:02d}"
+        
+        # Parse timestamp (handle various formats)
+        # Remove 'Z' suffix and any timezone info for parsing
+        clean_ts = timestamp_str.replace('Z', '').split('+')[0].split('.')[0]
+        dt = datetime.fromisoformat(clean_ts)
+        
+        # Calculate bucket
+        # Floor divide minutes to nearest bucket
+        bucketed_minute = (dt.minute // bucket_minutes) * bucket_minutes
+        
+        # Create bucketed datetime
+        bucketed_dt = dt.replace(minute=bucketed_minute, second=0, microsecond=0)
+        
+        # Return as string (without seconds for cleaner keys)
+        return bucketed_dt.strftime('%Y-%m-%dT%H:%M')
+    
+    except (ValueError, AttributeError, TypeError) as e:
+        # If parsing fails, return original (better than crashing)
+        # Logged rather than printed - no stdout lock/flush per bad alert
+        logger.warning("Could not parse timestamp %r: %s", timestamp_str, e)
+        return timestamp_str
+
+
+def _fast_key(
+    alert: Dict[str, Any],
+    key_fields: Sequence[str],
+    time_field: str,
+    bucket_minutes: int
+) -> str:
+    """
+    Build the readable (unhashed) dedupe key for one alert.
+    
+    Specialized core of generate_dedupe_key() with no options to check,
+    called directly from the per-alert grouping loop.
+    """
+    # Extract and normalize each key field
+    key_parts = [normalize_string(alert.get(field, "")) for field in key_fields]
+    
+    # Add bucketed timestamp if time_field exists
+    if time_field and time_field in alert:
+        key_parts.append(bucket_timestamp(alert[time_field], bucket_minutes))
+    
+    # Join parts with pipe delimiter
+    return "|".join(key_parts)
+
+
+def generate_dedupe_key(
+    alert: Dict[str, Any],
+    key_fields: Sequence[str],
+    time_field: str = "timestamp",
+    bucket_minutes: int = 60,
+    include_hash: bool = True
+) -> str:
+    """
+    Generate a deduplication key from alert fields.
+    
+    The key is deterministic - same input always produces same output.
+    Alerts with matching keys are candidates for grouping.
+    
+    Args:
+        alert: Alert dictionary
+        key_fields: List of field names to include in key (order matters)
+        time_field: Name of timestamp field (will be bucketed)
+        bucket_minutes: Time bucket size in minutes
+        include_hash: If True, append BLAKE2b hash for shorter keys
+    
+    Returns:
+        Dedupe key string
+    
+    Example:
+        alert = {"alert_type": "MFA_FAILURE", "source": "Defender", "timestamp": "..."}
+        key_fields = ["alert_type", "source"]
+        
+        Result: "mfa_failure|defender|2026-01-22T14:00"
+        Or with hash: "mfa_failure|defender|2026-01-22T14:00|a1b2c3d4"
+    """
+    key_string = _fast_key(alert, key_fields, time_field, bucket_minutes)
+    
+    # Optionally append hash for shorter, fixed-length keys
+    if include_hash:
+        # Not for security, just for key shortening - BLAKE2b with a 4-byte
+        # digest is cheaper than MD5 and yields the same 8 hex characters
+        hash_suffix = hashlib.blake2b(key_string.encode(), digest_size=4).hexdigest()
+        key_string = f"{key_string}|{hash_suffix}"
+    
+    return key_string
+
+
+def readable_keys(
+    alerts: List[Dict[str, Any]],
+    key_fields: Sequence[str],
+    time_field: str,
+    bucket_minutes: int
+) -> List[str]:
+    """
+    Build readable dedupe keys for a batch of alerts, in order.
+    
+    Same key as generate_dedupe_key(..., include_hash=False), built via
+    _fast_key() to skip the general-purpose wrapper.
+    """
+    return [
+        _fast_key(alert, key_fields, time_field, bucket_minutes)
+        for alert in alerts
+    ]
@@ -17,11 +17,142 @@ Author: Clinton Howard
 Date: January 2026
 """
 
-import re
+# The third-party regex module is a drop-in, generally faster engine for
+# these patterns; fall back to the standard library when it isn't installed.
+# (google-re2 is not an option: refang needs lookbehind.)
+try:
+    import regex as re
+except ImportError:
+    import re
 from typing import Dict, List, Set
 from collections import defaultdict
 
 
+# IOC patterns only ever match ASCII (digits, hex, hostnames), so they are
+# compiled with re.ASCII: \d, \w and \b use the regex engine's cheaper ASCII
+# classification instead of Unicode lookups, and look-alikes such as
+# non-ASCII digits can't slip into an "IP address". The URL pattern stays
+# Unicode-aware so any Unicode whitespace still ends a URL, and the domain
+# pattern does too so its \b doesn't split words like "münchen.de" at the
+# non-ASCII letter.
+
+# IP Address Pattern
+# Matches: 192.168.1.1, 10.0.0.5
+# Breakdown:
+#   \b          = word boundary (start of IP)
+#   \d{1,3}     = 1-3 digits
+#   \.          = literal dot
+#   (repeat 3 times for 4 octets)
+#   \b          = word boundary (end of IP)
+_IP_RE = re.compile(
+    r'\b(?:\d{1,3}\.){3}\d{1,3}\b',
+    re.ASCII
+)
+
+# Valid IP Pattern (full-string check used by is_valid_ip)
+# Validates the whole candidate in one native regex match - no Python-level
+# octet parsing per candidate
+# Breakdown:
+#   (?![12](?:\.0{0,2}\d){3}\Z) = reject version numbers (1.2.3.4: first
+#                                 octet 1 or 2, the rest single digits)
+#   25[0-5]                     = 250-255
+#   2[0-4]\d                    = 200-249
+#   [01]?\d?\d                  = 0-199 (leading zeros allowed: 010 = 10)
+#   (repeat for 4 octets)
+_VALID_IP_RE = re.compile(
+    r'(?![12](?:\.0{0,2}\d){3}\Z)'
+    r'(?:(?:25[0-5]|2[0-4]\d|[01]?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d?\d)',
+    re.ASCII
+)
+
+# Domain Patterns
+# Matches: example.com, sub.domain.co.uk, malicious-site.net
+# Applied to refanged text, so they only need to handle plain dots
+# (example[.]com and example\.com are converted before matching)
+# Breakdown:
+#   \b                          = word boundary
+#   (?:[a-z0-9]                 = label starts with a letter/number
+#   (?:[a-z0-9-]{0,61}          = up to 61 letters, numbers, hyphens
+#   [a-z0-9])?                  = label ends with a letter/number
+#   \.)+                        = dot, repeat for subdomains
+#   [a-z]{2,24}                 = TLD (2-24 letters: .com, .co.uk)
+#   \b                          = word boundary
+# A single regex for the whole domain is quadratic on long runs of dotted
+# labels ("a.a.a.a..."): when no TLD follows, the engine backtracks
+# through the whole chain from every label start. So the label chain is
+# matched on its own, and _domains_in_refanged() looks for the TLD in
+# Python - after the last label first, then after each shorter prefix,
+# the same order the backtracking regex tried - in one pass per chain.
+_DOMAIN_LABELS_RE = re.compile(
+    r'\b(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+',
+    re.IGNORECASE
+)
+_TLD_RE = re.compile(
+    r'[a-z]{2,24}\b',
+    re.IGNORECASE
+)
+
+# URL Pattern
+# Matches: http://example.com, hxxps://defanged[.]site
+# Breakdown:
+#   \b                          = word boundary
+#   h[tx]{2}ps?                 = http/https or hxxp/hxxps (defanged)
+#   ://                         = colon-slash-slash
+#   [^\s]+                      = any non-whitespace (rest of URL)
+_URL_RE = re.compile(
+    r'\bh[tx]{2}ps?://[^\s]+'
+)
+
+# Hash Pattern (one hex word, classified by length)
+# Matches: d2d2d2d2d2d2d2d2d2d2d2d2d2d2d2d2
+# Breakdown:
+#   \b          = word boundary
+#   [a-fA-F0-9] = hexadecimal characters
+#   {32,}       = 32 or more characters
+#   \b          = word boundary
+# A match is a whole hex word; _HASH_TYPES maps its length to the hash
+# type (MD5=32, SHA1=40, SHA256=64) and other lengths are dropped. One
+# scan replaces a separate exact-length pattern per hash type.
+_HASH_RE = re.compile(
+    r'\b[a-fA-F0-9]{32,}\b',
+    re.ASCII
+)
+_HASH_TYPES = {32: 'md5', 40: 'sha1', 64: 'sha256'}
+
+# Combined IP + Hash Pattern (used by extract_all)
+# Scans the text once for IPs and hex words; the named group that
+# matched (match.lastgroup) says which was found. IPs always contain
+# dots and hashes are dot-free hex words, so the alternatives never
+# compete for the same text - results match running the IP and hash
+# patterns separately.
+_IP_HASH_RE = re.compile(
+    r'(?P<ip>\b(?:\d{1,3}\.){3}\d{1,3}\b)'
+    r'|(?P<hash>\b[a-fA-F0-9]{32,}\b)',
+    re.ASCII
+)
+
+# Refang Pattern
+# Matches every defanged form in one pass; _REFANG_MAP gives the
+# replacement for each match
+#   hxxps?://       = defanged URL scheme
+#   (?<!\\)\\\[\.\] = escaped bracketed dot (\[.] -> \. -> .)
+#   \[\.\]          = bracketed dot
+#   (?<!\\)\\\.     = escaped dot (not preceded by another backslash)
+_REFANG_RE = re.compile(
+    r'hxxps://|hxxp://|(?<!\\)\\\[\.\]|\[\.\]|(?<!\\)\\\.'
+)
+_REFANG_MAP = {
+    'hxxps://': 'https://',
+    'hxxp://': 'http://',
+    '\\[.]': '.',
+    '[.]': '.',
+    '\\.': '.'
+}
+
+# File extensions that look like TLDs (report.pdf is not a domain)
+_FILE_EXT = frozenset({'txt', 'log', 'jpg', 'png', 'pdf', 'doc', 'docx', 'xlsx', 'zip'})
+
+
 class IOCExtractor:
     """
     Extract and validate Indicators of Compromise from text.
@@ -31,65 +162,21 @@ class IOCExtractor:
     """
     
     def __init__(self):
-        """Initialize regex patterns for different IOC types."""
-        
-        # IP Address Pattern
-        # Matches: 192.168.1.1, 10.0.0.5
-        # Breakdown:
-        #   \b          = word boundary (start of IP)
-        #   \d{1,3}     = 1-3 digits
-        #   \.          = literal dot
-        #   (repeat 3 times for 4 octets)
-        #   \b          = word boundary (end of IP)
-        self.ip_pattern = re.compile(
-            r'\b(?:\d{1,3}\.){3}\d{1,3}\b'
-        )
-        
-        # Domain Pattern
-        # Matches: example.com, sub.domain.co.uk, malicious-site.net
-        # Also handles defanged: example[.]com, example\.com
-        # Breakdown:
-        #   \b                          = word boundary
-        #   (?:[a-zA-Z0-9-]+            = subdomain/domain part (letters, numbers, hyphens)
-        #   (?:\[?\.\]?|\\.)            = dot, bracket-dot, or escaped-dot
-        #   )+                          = repeat for subdomains
-        #   [a-zA-Z]{2,}                = TLD (at least 2 letters: .com, .co.uk)
-        #   \b                          = word boundary
-        self.domain_pattern = re.compile(
-            r'\b(?:[a-zA-Z0-9-]+(?:\[?\.\]?|\\.)){1,}[a-zA-Z]{2,}\b'
-        )
-        
-        # URL Pattern
-        # Matches: http://example.com, hxxps://defanged[.]site
-        # Breakdown:
-        #   \b                          = word boundary
-        #   h[tx]{2}ps?                 = http/https or hxxp/hxxps (defanged)
-        #   ://                         = colon-slash-slash
-        #   [^\s]+                      = any non-whitespace (rest of URL)
-        self.url_pattern = re.compile(
-            r'\bh[tx]{2}ps?://[^\s]+'
-        )
-        
-        # MD5 Hash Pattern (32 hex characters)
-        # Matches: d2d2d2d2d2d2d2d2d2d2d2d2d2d2d2d2
-        # Breakdown:
-        #   \b          = word boundary
-        #   [a-fA-F0-9] = hexadecimal characters
-        #   {32}        = exactly 32 characters
-        #   \b          = word boundary
-        self.md5_pattern = re.compile(
-            r'\b[a-fA-F0-9]{32}\b'
-        )
-        
-        # SHA1 Hash Pattern (40 hex characters)
-        self.sha1_pattern = re.compile(
-            r'\b[a-fA-F0-9]{40}\b'
-        )
-        
-        # SHA256 Hash Pattern (64 hex characters)
-        self.sha256_pattern = re.compile(
-            r'\b[a-fA-F0-9]{64}\b'
-        )
+        """
+        Bind the module-level patterns for different IOC types.
+        
+        Patterns are compiled once at import, so creating an extractor
+        per alert costs nothing extra.
+        """
+        self.ip_pattern = _IP_RE
+        self.valid_ip_pattern = _VALID_IP_RE
+        self.domain_labels_pattern = _DOMAIN_LABELS_RE
+        self.tld_pattern = _TLD_RE
+        self.url_pattern = _URL_RE
+        self.hash_pattern = _HASH_RE
+        self.ip_hash_pattern = _IP_HASH_RE
+        self.refang_pattern = _REFANG_RE
+        self.refang_map = _REFANG_MAP
     
     
     def refang(self, text: str) -> str:
@@ -107,18 +194,13 @@ class IOCExtractor:
         Returns:
             Text with indicators refanged (restored to normal)
         """
-        # Replace hxxp/hxxps with http/https
-        text = text.replace('hxxp://', 'http://')
-        text = text.replace('hxxps://', 'https://')
-        
-        # Replace [.] with .
-        text = text.replace('[.]', '.')
-        
-        # Replace \. with . (but keep actual regex escapes)
-        # Only replace if not preceded by backslash (avoid breaking actual escapes)
-        text = re.sub(r'(?<!\\)\\\.', '.', text)
-        
-        return text
+        # Single pass replacing:
+        # - hxxp/hxxps with http/https
+        # - [.] with .
+        # - \. with . (but keep actual regex escapes - only replaced if
+        #   not preceded by backslash, to avoid breaking actual escapes)
+        refang_map = self.refang_map
+        return self.refang_pattern.sub(lambda match: refang_map[match.group()], text)
     
     
     def is_valid_ip(self, ip: str) -> bool:
@@ -136,27 +218,9 @@ class IOCExtractor:
         Returns:
             True if valid IPv4 address
         """
-        octets = ip.split('.')
-        
-        # Must have exactly 4 octets
-        if len(octets) != 4:
-            return False
-        
-        # Each octet must be 0-255
-        try:
-            for octet in octets:
-                num = int(octet)
-                if num < 0 or num > 255:
-                    return False
-        except ValueError:
-            return False
-        
-        # Filter out common false positives
-        # Version numbers often start with 1. or 2.
-        if octets[0] in ['1', '2'] and all(int(o) < 10 for o in octets[1:]):
-            return False
-        
-        return True
+        # Must be exactly 4 octets, each 0-255, and not a version number
+        # (a single C-level regex match)
+        return self.valid_ip_pattern.fullmatch(ip) is not None
     
     
     def is_valid_domain(self, domain: str) -> bool:
@@ -174,16 +238,18 @@ class IOCExtractor:
         Returns:
             True if likely a real domain
         """
+        # Get TLD (last part after final dot) - rpartition scans once from
+        # the right without building a list of every label
+        _, dot, tld = domain.rpartition('.')
+        
         # Must contain at least one dot
-        if '.' not in domain:
+        if not dot:
             return False
         
-        # Get TLD (last part after final dot)
-        tld = domain.split('.')[-1].lower()
+        tld = tld.lower()
         
         # Filter out file extensions
-        file_extensions = ['txt', 'log', 'jpg', 'png', 'pdf', 'doc', 'docx', 'xlsx', 'zip']
-        if tld in file_extensions:
+        if tld in _FILE_EXT:
             return False
         
         # TLD must be at least 2 characters
@@ -203,16 +269,16 @@ class IOCExtractor:
         Returns:
             List of unique valid IP addresses
         """
-        # Find all potential IPs
-        potential_ips = self.ip_pattern.findall(text)
-        
-        # Validate and deduplicate
-        valid_ips = set()
-        for ip in potential_ips:
-            if self.is_valid_ip(ip):
-                valid_ips.add(ip)
+        # Find, validate and deduplicate potential IPs in one pass
+        # (validator bound once - same check as is_valid_ip)
+        is_valid = self.valid_ip_pattern.fullmatch
+        valid_ips = {
+            match.group()
+            for match in self.ip_pattern.finditer(text)
+            if is_valid(match.group())
+        }
         
-        return sorted(list(valid_ips))
+        return sorted(valid_ips)
     
     
     def extract_domains(self, text: str) -> List[str]:
@@ -226,21 +292,48 @@ class IOCExtractor:
             List of unique valid domains
         """
         # Refang defanged indicators first
-        text = self.refang(text)
-        
-        # Find all potential domains
-        potential_domains = self.domain_pattern.findall(text)
-        
-        # Validate and deduplicate
+        return sorted(self._domains_in_refanged(self.refang(text)))
+    
+    
+    def _domains_in_refanged(self, text: str) -> Set[str]:
+        """Find, validate and deduplicate domains in already-refanged text."""
         valid_domains = set()
-        for domain in potential_domains:
-            # Clean up any remaining defang artifacts
-            domain = domain.replace('[.]', '.').replace('\\.', '.')
+        match_tld = self.tld_pattern.match
+        pos = 0
+        
+        while True:
+            labels = self.domain_labels_pattern.search(text, pos)
+            if labels is None:
+                break
+            start, end = labels.span()
+            
+            # Longest domain first: TLD after the last label, then after
+            # each shorter run of labels (tld_start is just past a dot)
+            tld_start = end
+            tld = match_tld(text, tld_start)
+            while tld is None:
+                dot = text.rfind('.', start, tld_start - 1)
+                if dot < 0:
+                    break
+                tld_start = dot + 1
+                tld = match_tld(text, tld_start)
+            
+            # No TLD anywhere in the chain - every later start inside it
+            # would fail the same way, so resume after it
+            if tld is None:
+                pos = end
+                continue
+            pos = tld.end()
+            
+            # The patterns only match letters, digits, '-' and '.', so no
+            # defang artifacts can remain here. Lowercased once, shared by
+            # validation and the result set
+            domain = text[start:pos].lower()
             
             if self.is_valid_domain(domain):
-                valid_domains.add(domain.lower())
+                valid_domains.add(domain)
         
-        return sorted(list(valid_domains))
+        return valid_domains
     
     
     def extract_urls(self, text: str) -> List[str]:
@@ -254,13 +347,12 @@ class IOCExtractor:
             List of unique URLs (refanged)
         """
         # Refang defanged URLs first
-        text = self.refang(text)
-        
-        # Find all URLs
-        urls = self.url_pattern.findall(text)
-        
-        # Deduplicate and return
-        return sorted(list(set(urls)))
+        return sorted(self._urls_in_refanged(self.refang(text)))
+    
+    
+    def _urls_in_refanged(self, text: str) -> Set[str]:
+        """Find and deduplicate URLs in already-refanged text."""
+        return {match.group() for match in self.url_pattern.finditer(text)}
     
     
     def extract_hashes(self, text: str) -> Dict[str, List[str]]:
@@ -274,35 +366,78 @@ class IOCExtractor:
             Dictionary with hash types as keys, lists of hashes as values
         """
         hashes = {
-            'md5': [],
-            'sha1': [],
-            'sha256': []
+            'md5': set(),
+            'sha1': set(),
+            'sha256': set()
         }
         
-        # Extract each hash type
-        # Note: Check longer hashes first to avoid misidentifying SHA256 as two SHA1s
-        hashes['sha256'] = sorted(list(set(self.sha256_pattern.findall(text))))
-        hashes['sha1'] = sorted(list(set(self.sha1_pattern.findall(text))))
-        hashes['md5'] = sorted(list(set(self.md5_pattern.findall(text))))
+        # One scan for hex words; the length decides the hash type
+        for match in self.hash_pattern.finditer(text):
+            value = match.group()
+            hash_type = _HASH_TYPES.get(len(value))
+            if hash_type:
+                hashes[hash_type].add(value)
         
-        return hashes
+        return {hash_type: sorted(found) for hash_type, found in hashes.items()}
     
     
     def extract_all(self, text: str) -> Dict[str, any]:
         """
         Extract all IOC types from text in one pass.
         
+        Matches are collected into sets and each list is sorted exactly
+        once, right before returning - the per-type extract_* methods
+        aren't called, so nothing is sorted twice. Sorting keeps the
+        output deterministic for reports and case notes.
+        
         Args:
             text: Input text to search
         
         Returns:
-            Dictionary containing all extracted IOCs by type
+            Dictionary containing all extracted IOCs by type (sorted lists)
         """
+        valid_ips = set()
+        hashes = {
+            'md5': set(),
+            'sha1': set(),
+            'sha256': set()
+        }
+        domains = set()
+        urls = set()
+        
+        # Cheap substring prefilters rule out whole IOC classes before
+        # any regex runs: IPs and domains need a dot ('[.]' and '\.'
+        # refang to one), URLs need '://', and hashes need 32+ chars.
+        # Hashes may be all decimal digits, so hex letters prove nothing.
+        has_dot = '.' in text
+        has_scheme = '://' in text
+        
+        # One scan for IPs and hashes, dispatched by the matching group
+        if has_dot or len(text) >= 32:
+            is_valid_ip = self.valid_ip_pattern.fullmatch
+            for match in self.ip_hash_pattern.finditer(text):
+                value = match.group()
+                if match.lastgroup == 'ip':
+                    if is_valid_ip(value):
+                        valid_ips.add(value)
+                else:
+                    hash_type = _HASH_TYPES.get(len(value))
+                    if hash_type:
+                        hashes[hash_type].add(value)
+        
+        # Refang once and share the result between domains and URLs
+        if has_dot or has_scheme:
+            refanged = self.refang(text)
+            if has_dot:
+                domains = self._domains_in_refanged(refanged)
+            if has_scheme:
+                urls = self._urls_in_refanged(refanged)
+        
         return {
-            'ips': self.extract_ips(text),
-            'domains': self.extract_domains(text),
-            'urls': self.extract_urls(text),
-            'hashes': self.extract_hashes(text)
+            'ips': sorted(valid_ips),
+            'domains': sorted(domains),
+            'urls': sorted(urls),
+            'hashes': {hash_type: sorted(found) for hash_type, found in hashes.items()}
         }
 
 
@@ -10,15 +10,38 @@ Author: Clinton Howard
 Date: January 2026
 """
 
+import re
 import json
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback when orjson isn't installed
+    orjson = None
 
 
 # Valid severity levels accepted by case management system
-VALID_SEVERITIES = ["low", "medium", "high", "critical"]
+VALID_SEVERITIES = frozenset({"low", "medium", "high", "critical"})
 DEFAULT_SEVERITY = "medium"
 
+# Exact-match lookup for the common spellings ("HIGH", "High", "high"),
+# so they skip the lower()/strip() normalization
+_SEVERITY_LOOKUP = {
+    variant: level
+    for level in VALID_SEVERITIES
+    for variant in (level, level.upper(), level.title())
+}
+
+# Canonical UTC timestamp shape: YYYY-MM-DDTHH:MM:SS[.fff]Z
+# Timestamps in this shape are normalized by slicing, without parsing
+_UTC_TIMESTAMP_RE = re.compile(
+    r'\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])'
+    r'T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d(?:\.\d+)?Z',
+    re.ASCII
+)
+
 
 def normalize_timestamp(timestamp_str: str) -> str:
     """
@@ -33,6 +56,11 @@ def normalize_timestamp(timestamp_str: str) -> str:
     Returns:
         Normalized timestamp string without milliseconds
     """
+    # Fast path: canonical UTC shape - just drop the milliseconds
+    # (non-strings such as epoch numbers fall through to the warning below)
+    if type(timestamp_str) is str and _UTC_TIMESTAMP_RE.fullmatch(timestamp_str):
+        return timestamp_str[:19] + 'Z'
+    
     try:
         # Parse the timestamp (handles with or without milliseconds)
         dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
@@ -61,6 +89,11 @@ def normalize_severity(severity_str: Optional[str]) -> str:
     if not severity_str:
         return DEFAULT_SEVERITY
     
+    # Fast path: already a known spelling
+    severity = _SEVERITY_LOOKUP.get(severity_str)
+    if severity is not None:
+        return severity
+    
     # Convert to lowercase
     normalized = severity_str.lower().strip()
     
@@ -73,10 +106,59 @@ def normalize_severity(severity_str: Optional[str]) -> str:
     return DEFAULT_SEVERITY
 
 
-def transform_alert(raw_alert: Dict[str, Any]) -> Dict[str, Any]:
+@dataclass(slots=True)
+class Alert:
+    """
+    Alert in the standardized case management format.
+    
+    Slotted, so each transformed alert is a fixed-shape record rather
+    than a fresh dict. orjson serializes it directly; use
+    dataclasses.asdict() where a plain dict is needed.
+    """
+    timestamp: str
+    source_system: Any
+    alert_id: Any
+    tenant: Any
+    severity: str
+    user: Any
+    source_ip: Any
+    description: Any
+    metadata: Dict[str, Any]
+
+
+# Flat field mapping applied by transform_alert(), in output order:
+# (raw SIEM key, Alert field, default, optional normalizer)
+_FIELD_MAP = (
+    # Source system: use as-is (preserve original casing for vendor names)
+    ("EventSource", "source_system", "Unknown", None),
+    # Alert ID: critical for tracking
+    ("EventID", "alert_id", None, None),
+    # Tenant: preserve original casing (company names)
+    ("Customer", "tenant", None, None),
+    # Severity: normalize and validate
+    ("Alert_Severity", "severity", None, normalize_severity),
+    # User: convert field name, preserve value
+    ("affected_user", "user", None, None),
+    # Source IP: convert field name
+    ("SourceIP", "source_ip", None, None),
+    # Description: keep verbatim (important for analyst context)
+    ("Description", "description", None, None),
+)
+
+
+def _utc_now_iso() -> str:
+    """Current UTC time in the ISO 8601 'Z' form used for missing EventTime."""
+    return datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def transform_alert(raw_alert: Dict[str, Any]) -> Alert:
     """
     Transform raw SIEM alert into standardized case management format.
     
+    Alerts are dispatched on EventSource to a transform specialized for
+    that vendor (see _build_vendor_transform); unknown or non-string
+    sources use the generic field-map implementation.
+    
     This handles:
     - Field name mapping (EventTime -> timestamp)
     - Data type normalization (uppercase -> lowercase)
@@ -87,11 +169,37 @@ def transform_alert(raw_alert: Dict[str, Any]) -> Dict[str, Any]:
         raw_alert: Raw alert dictionary from SIEM
     
     Returns:
-        Transformed alert dictionary ready for case creation
+        Transformed Alert ready for case creation
     """
+    vendor = raw_alert.get("EventSource")
+    if type(vendor) is not str:
+        return _transform_generic(raw_alert)
+    
+    transform = _vendor_transforms.get(vendor)
+    if transform is None:
+        if len(_vendor_transforms) >= VENDOR_TRANSFORM_LIMIT:
+            return _transform_generic(raw_alert)
+        transform = _vendor_transforms[vendor] = _build_vendor_transform(vendor)
+    
+    return transform(raw_alert)
+
+
+def _transform_generic(raw_alert: Dict[str, Any]) -> Alert:
+    """
+    Transform raw SIEM alert into standardized case management format.
+    
+    This handles:
+    - Field name mapping (EventTime -> timestamp)
+    - Data type normalization (uppercase -> lowercase)
+    - Missing field handling (set to None)
+    - Nested data restructuring (RawData -> metadata)
     
-    # Initialize output structure
-    transformed = {}
+    Args:
+        raw_alert: Raw alert dictionary from SIEM
+    
+    Returns:
+        Transformed Alert ready for case creation
+    """
     
     # --- Required Fields (with safe defaults) ---
     
@@ -99,34 +207,17 @@ def transform_alert(raw_alert: Dict[str, Any]) -> Dict[str, Any]:
     # Get EventTime or generate current UTC timestamp as default
     event_time = raw_alert.get("EventTime")
     if event_time is None:
-        event_time = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
-    
-    transformed["timestamp"] = normalize_timestamp(event_time)
-    
-    # Source system: use as-is (preserve original casing for vendor names)
-    transformed["source_system"] = raw_alert.get("EventSource", "Unknown")
-    
-    # Alert ID: critical for tracking
-    transformed["alert_id"] = raw_alert.get("EventID", None)
-    
-    # Tenant: preserve original casing (company names)
-    transformed["tenant"] = raw_alert.get("Customer", None)
-    
-    # Severity: normalize and validate
-    transformed["severity"] = normalize_severity(
-        raw_alert.get("Alert_Severity")
-    )
-    
-    # --- Optional Fields (may be missing) ---
-    
-    # User: convert field name, preserve value
-    transformed["user"] = raw_alert.get("affected_user", None)
+        event_time = _utc_now_iso()
     
-    # Source IP: convert field name
-    transformed["source_ip"] = raw_alert.get("SourceIP", None)
+    timestamp = normalize_timestamp(event_time)
     
-    # Description: keep verbatim (important for analyst context)
-    transformed["description"] = raw_alert.get("Description", None)
+    # Flat fields: renamed (and optionally normalized) per _FIELD_MAP,
+    # keyed by Alert field name like the generated vendor transforms
+    flat_fields: Dict[str, Any] = {
+        dst: transform(raw_alert.get(src, default)) if transform
+        else raw_alert.get(src, default)
+        for src, dst, default, transform in _FIELD_MAP
+    }
     
     # --- Nested Metadata Transformation ---
     
@@ -134,14 +225,77 @@ def transform_alert(raw_alert: Dict[str, Any]) -> Dict[str, Any]:
     raw_data = raw_alert.get("RawData", {})
     
     if raw_data:
-        transformed["metadata"] = {
+        metadata = {
             "login_attempts": raw_data.get("LoginAttempts", None),
             "geo_location": raw_data.get("Country", None)
         }
     else:
-        transformed["metadata"] = {}
+        metadata = {}
+    
+    return Alert(timestamp=timestamp, metadata=metadata, **flat_fields)
+
+
+# Vendor-specialized transforms, generated on first sight of each
+# EventSource. Capped so a stream of junk sources can't grow it forever.
+VENDOR_TRANSFORM_LIMIT = 64
+_vendor_transforms: Dict[str, Callable[[Dict[str, Any]], Alert]] = {}
+
+
+def _build_vendor_transform(vendor: str) -> Callable[[Dict[str, Any]], Alert]:
+    """
+    Generate a transform_alert() specialized for a single EventSource.
     
-    return transformed
+    Emits straight-line Python source equivalent to _transform_generic()
+    with the _FIELD_MAP loop unrolled into a single Alert(...) call and
+    the vendor name folded in as a constant, then compiles it with exec().
+    
+    Args:
+        vendor: EventSource value the generated function will handle
+    
+    Returns:
+        Function taking a raw alert and returning the transformed Alert
+    """
+    namespace = {
+        "_Alert": Alert,
+        "_normalize_timestamp": normalize_timestamp,
+        "_utc_now_iso": _utc_now_iso,
+    }
+    fields = []
+    for src, dst, default, transform in _FIELD_MAP:
+        if src == "EventSource":
+            value = repr(vendor)
+        else:
+            value = f"r.get({src!r}, {default!r})"
+            if transform:
+                namespace[f"_{dst}_transform"] = transform
+                value = f"_{dst}_transform({value})"
+        fields.append(f"        {dst}={value},")
+    
+    source = "\n".join([
+        "def transform(r):",
+        "    event_time = r.get('EventTime')",
+        "    if event_time is None:",
+        "        event_time = _utc_now_iso()",
+        "    raw_data = r.get('RawData', {})",
+        "    return _Alert(",
+        "        timestamp=_normalize_timestamp(event_time),",
+        *fields,
+        "        metadata={",
+        "            'login_attempts': raw_data.get('LoginAttempts', None),",
+        "            'geo_location': raw_data.get('Country', None)",
+        "        } if raw_data else {},",
+        "    )",
+    ])
+    exec(compile(source, f"<transform_alert:{vendor}>", "exec"), namespace)
+    return namespace["transform"]
+
+
+def _dumps_pretty(obj: Any) -> str:
+    """Serialize obj as 2-space indented JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    # Alert records are converted to dicts at the JSON boundary
+    return json.dumps(obj, indent=2, default=asdict)
 
 
 def main():
@@ -172,13 +326,13 @@ def main():
     print("ALERT PAYLOAD TRANSFORMATION DEMO")
     print("=" * 60)
     print("\nRAW INPUT (from SIEM):")
-    print(json.dumps(raw_alert, indent=2))
+    print(_dumps_pretty(raw_alert))
     
     # Transform the alert
     transformed = transform_alert(raw_alert)
     
     print("\nTRANSFORMED OUTPUT (for case management):")
-    print(json.dumps(transformed, indent=2))
+    print(_dumps_pretty(transformed))
     
     print("\n" + "=" * 60)
     print("TESTING MISSING FIELDS")
@@ -192,12 +346,12 @@ def main():
     }
     
     print("\nINCOMPLETE INPUT:")
-    print(json.dumps(incomplete_alert, indent=2))
+    print(_dumps_pretty(incomplete_alert))
     
     transformed_incomplete = transform_alert(incomplete_alert)
     
     print("\nTRANSFORMED OUTPUT (with defaults):")
-    print(json.dumps(transformed_incomplete, indent=2))
+    print(_dumps_pretty(transformed_incomplete))
     
     print("\nTransformation complete!")
     print("\nKey observations:")